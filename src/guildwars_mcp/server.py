@@ -1,7 +1,12 @@
 """Guild Wars Wiki MCP Server with SSE support."""
 
 import asyncio
+import hashlib
 import logging
+import os
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import Callable
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from mcp.server.sse import SseServerTransport
@@ -10,8 +15,11 @@ from starlette.routing import Route, Mount
 from starlette.responses import Response
 import uvicorn
 
+from .cache import TTLCache
 from .wiki_parser import (
-    fetch_wiki_page,
+    get_client,
+    close_client,
+    fetch_first_successful,
     parse_quest_page,
     format_quest_response,
     parse_skill_page,
@@ -20,6 +28,8 @@ from .wiki_parser import (
     parse_pve_builds,
     format_pve_builds_response,
     PVE_BUILD_CATEGORIES,
+    PAGE_CACHE_SIZE,
+    PAGE_CACHE_TTL,
 )
 
 # Set up logging
@@ -31,58 +41,78 @@ mcp_server = Server("guildwars-wiki")
 # Create a single SSE transport shared across requests
 sse_transport = SseServerTransport("/messages/")
 
+# Rendered tool responses, keyed by tool, arguments and a digest of the page
+# HTML. A refetched page with new content gets a new key, so stale responses
+# are never served and simply age out of the cache.
+_response_cache = TTLCache(maxsize=PAGE_CACHE_SIZE)
+
+
+def _render_cached(tool: str, args: tuple, html: str, render: Callable[[], str]) -> str:
+    """Return the cached response for this page and arguments, rendering it on a miss."""
+    digest = hashlib.blake2b(html.encode(), digest_size=16).digest()
+    key = (tool, args, digest)
+    text = _response_cache.get(key)
+    if text is None:
+        text = render()
+        _response_cache.set(key, text, PAGE_CACHE_TTL)
+    return text
+
+
+# The tool schemas are static, so they are built once instead of per handshake.
+_TOOLS: list[Tool] = [
+    Tool(
+        name="get_quest_info",
+        description="Gets detailed information about a Guild Wars quest including objectives, rewards, and walkthrough. Use this when users ask about specific quests.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "quest_name": {
+                    "type": "string",
+                    "description": "The exact name of the quest (e.g., 'Against the Charr', 'The Path to Glory')"
+                }
+            },
+            "required": ["quest_name"]
+        }
+    ),
+    Tool(
+        name="get_skill_info",
+        description="Gets information about a specific Guild Wars skill including stats, profession, attribute, and description.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "skill_name": {
+                    "type": "string",
+                    "description": "The exact name of the skill (e.g., 'Meteor Shower', 'Healing Breeze')"
+                }
+            },
+            "required": ["skill_name"]
+        }
+    ),
+    Tool(
+        name="get_pve_builds",
+        description="Gets PvE build names from the GWPvX wiki by category (e.g., farming, running, hero, speedclear).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "category": {
+                    "type": "string",
+                    "description": "One of: general, farming, running, quest, hero, speedclear, teams"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Optional limit for number of builds to return (e.g., 10)"
+                }
+            },
+            "required": ["category"]
+        }
+    ),
+]
+
 
 @mcp_server.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
-    return [
-        Tool(
-            name="get_quest_info",
-            description="Gets detailed information about a Guild Wars quest including objectives, rewards, and walkthrough. Use this when users ask about specific quests.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "quest_name": {
-                        "type": "string",
-                        "description": "The exact name of the quest (e.g., 'Against the Charr', 'The Path to Glory')"
-                    }
-                },
-                "required": ["quest_name"]
-            }
-        ),
-        Tool(
-            name="get_skill_info",
-            description="Gets information about a specific Guild Wars skill including stats, profession, attribute, and description.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "skill_name": {
-                        "type": "string",
-                        "description": "The exact name of the skill (e.g., 'Meteor Shower', 'Healing Breeze')"
-                    }
-                },
-                "required": ["skill_name"]
-            }
-        ),
-        Tool(
-            name="get_pve_builds",
-            description="Gets PvE build names from the GWPvX wiki by category (e.g., farming, running, hero, speedclear).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "category": {
-                        "type": "string",
-                        "description": "One of: general, farming, running, quest, hero, speedclear, teams"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Optional limit for number of builds to return (e.g., 10)"
-                    }
-                },
-                "required": ["category"]
-            }
-        ),
-    ]
+    return _TOOLS
 
 
 @mcp_server.call_tool()
@@ -91,9 +121,9 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     try:
         if name == "get_quest_info":
             quest_name = arguments["quest_name"]
-            logger.info(f"Fetching quest info for: {quest_name}")
+            logger.info("Fetching quest info for: %s", quest_name)
             
-            html = await fetch_wiki_page(quest_name)
+            html = await fetch_first_successful([quest_name, quest_name.title()])
             
             if html is None:
                 return [TextContent(
@@ -101,16 +131,20 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                     text=f"Could not fetch information for quest '{quest_name}'. The quest may not exist or there was a network error."
                 )]
             
-            quest_data = parse_quest_page(html, quest_name)
-            response_text = format_quest_response(quest_data)
+            response_text = _render_cached(
+                name,
+                (quest_name,),
+                html,
+                lambda: format_quest_response(parse_quest_page(html, quest_name)),
+            )
             
             return [TextContent(type="text", text=response_text)]
         
         elif name == "get_skill_info":
             skill_name = arguments["skill_name"]
-            logger.info(f"Fetching skill info for: {skill_name}")
+            logger.info("Fetching skill info for: %s", skill_name)
             
-            html = await fetch_wiki_page(skill_name)
+            html = await fetch_first_successful([skill_name, skill_name.title()])
             
             if html is None:
                 return [TextContent(
@@ -118,8 +152,12 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                     text=f"Could not fetch information for skill '{skill_name}'. The skill may not exist or there was a network error."
                 )]
             
-            skill_data = parse_skill_page(html, skill_name)
-            response_text = format_skill_response(skill_data)
+            response_text = _render_cached(
+                name,
+                (skill_name,),
+                html,
+                lambda: format_skill_response(parse_skill_page(html, skill_name)),
+            )
             
             return [TextContent(type="text", text=response_text)]
 
@@ -134,7 +172,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                     text=f"Invalid category '{category}'. Valid options: {valid}"
                 )]
 
-            logger.info(f"Fetching PvE builds for category: {category}")
+            logger.info("Fetching PvE builds for category: %s", category)
             path = PVE_BUILD_CATEGORIES[category]
             html = await fetch_gwpvx_page(path)
 
@@ -144,8 +182,12 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                     text=f"Could not fetch PvE builds for category '{category}'."
                 )]
 
-            builds = parse_pve_builds(html)
-            response_text = format_pve_builds_response(category, builds, limit)
+            response_text = _render_cached(
+                name,
+                (category, limit),
+                html,
+                lambda: format_pve_builds_response(category, parse_pve_builds(html), limit),
+            )
 
             return [TextContent(type="text", text=response_text)]
         
@@ -156,7 +198,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             )]
             
     except Exception as e:
-        logger.error(f"Error handling tool call: {e}", exc_info=True)
+        logger.error("Error handling tool call: %s", e, exc_info=True)
         return [TextContent(
             type="text",
             text=f"Error: {str(e)}"
@@ -182,17 +224,45 @@ async def handle_sse(request):
     return Response()
 
 
-# Health check endpoint
+# Health check endpoint. The body never changes, so it is encoded once.
+_HEALTH_BODY = b'{"status": "healthy"}'
+
+
 async def health_check(request):
     """Health check endpoint."""
     return Response(
-        content='{"status": "healthy"}',
+        content=_HEALTH_BODY,
         media_type="application/json"
     )
 
 
+async def warm_pve_builds():
+    """Prefetch every PvE build category so first lookups hit the page cache."""
+    start = time.perf_counter()
+    pages = await asyncio.gather(*(fetch_gwpvx_page(path) for path in PVE_BUILD_CATEGORIES.values()))
+    warmed = sum(page is not None for page in pages)
+    logger.info("Warmed %d PvX categories in %.2fs", warmed, time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Open the shared wiki HTTP client and warm the build cache on startup."""
+    await get_client()
+    # Warm in the background so a slow wiki never holds up startup.
+    warmup = asyncio.create_task(warm_pve_builds())
+    try:
+        yield
+    finally:
+        # Let the warm-up unwind before its client is closed underneath it.
+        warmup.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup
+        await close_client()
+
+
 # Create Starlette app
 app = Starlette(
+    lifespan=lifespan,
     routes=[
         Route("/sse", handle_sse),
         Mount("/messages/", app=sse_transport.handle_post_message),
@@ -202,13 +272,36 @@ app = Starlette(
 
 
 def run():
-    """Run the SSE server."""
+    """Run the SSE server.
+
+    SseServerTransport keeps MCP sessions in memory, so the GET /sse stream
+    and the POST /messages/ calls of a session must reach the same process.
+    The server therefore always runs a single worker; a WEB_CONCURRENCY above
+    1 is ignored with a warning. To scale out, run several single-worker
+    instances (for example with gunicorn from the "gunicorn" extra) behind a
+    load balancer with sticky sessions:
+
+        gunicorn -k uvicorn.workers.UvicornWorker -w 1 guildwars_mcp.server:app
+
+    Each instance keeps its own page and response caches.
+    """
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        logger.warning(
+            "Ignoring WEB_CONCURRENCY=%d: SSE sessions are held in process memory, "
+            "so the server must run a single worker",
+            workers,
+        )
     logger.info("Starting Guild Wars Wiki MCP server with SSE transport")
+    # Access logging is off since it costs more than the small tool requests
+    # themselves. uvicorn picks uvloop and httptools automatically when the
+    # "speedups" extra is installed.
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=8000,
-        log_level="info"
+        log_level="warning",
+        access_log=False,
     )
 
 
@@ -1,10 +1,15 @@
 """Wiki parsing utilities for Guild Wars Wiki and PvX builds."""
 
+import asyncio
+import re
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 from typing import Optional, Dict, Any
 import logging
 
+from .cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 WIKI_BASE_URL = "https://wiki.guildwars.com/wiki"
@@ -22,53 +27,264 @@ PVE_BUILD_CATEGORIES = {
     "teams": "Category:All_working_PvE_team_builds",
 }
 
+# Fetched pages are cached by URL as (html, validators), where validators are
+# the conditional request headers built from the response's ETag and
+# Last-Modified. Pages that could not be fetched are cached briefly with html
+# None so repeated lookups of a missing page do not hammer the wiki.
+PAGE_CACHE_SIZE = 512
+PAGE_CACHE_TTL = 3600.0
+MISSING_PAGE_TTL = 60.0
+
+_page_cache = TTLCache(maxsize=PAGE_CACHE_SIZE)
+
+# Cap concurrent requests per wiki host so bursts of tool calls queue locally
+# instead of tripping the wikis' rate limits.
+MAX_REQUESTS_PER_HOST = 8
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+# Everything the quest and skill parsers read lives in the article body, and
+# MediaWiki emits the print footer right after it. Wiki pages are streamed and
+# the download stops there, so navigation, footers and scripts are never
+# buffered or parsed.
+WIKI_CONTENT_END = '<div class="printfooter"'
+
+
+# Shared client so connections to the wiki hosts are pooled and kept alive
+# across tool calls instead of paying a fresh TCP + TLS handshake each time.
+# HTTP/2 lets concurrent fetches to the same host multiplex on one connection,
+# and with the brotli extra installed httpx also advertises "br", which
+# compresses wiki HTML better than gzip.
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=30.0,
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=True,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client if it was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def normalize_title(page_name: str) -> str:
+    """Normalize a page name the way MediaWiki does for URLs.
+
+    Spaces become underscores and the first letter is capitalized, so
+    "meteor Shower" and "Meteor_Shower" resolve to the same page.
+    """
+    title = page_name.strip().replace(' ', '_')
+    return title[:1].upper() + title[1:]
+
+
+async def _read_text(response: httpx.Response, stop_at: Optional[str]) -> str:
+    """Read a streamed response body, stopping before stop_at if it appears."""
+    if stop_at is None:
+        await response.aread()
+        return response.text
+
+    parts: list[str] = []
+    length = 0
+    tail = ""
+    async for chunk in response.aiter_text():
+        # Search across the chunk boundary in case the marker is split.
+        window = tail + chunk
+        index = window.find(stop_at)
+        if index != -1:
+            parts.append(chunk)
+            return "".join(parts)[:length - len(tail) + index]
+        parts.append(chunk)
+        length += len(chunk)
+        tail = window[-len(stop_at):]
+    return "".join(parts)
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    """Return the request semaphore for the host serving url."""
+    host = httpx.URL(url).host
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(MAX_REQUESTS_PER_HOST)
+    return _host_limits[host]
+
+
+def _validators(response: httpx.Response) -> Dict[str, str]:
+    """Build conditional request headers from a response's cache validators."""
+    validators = {}
+    if etag := response.headers.get("ETag"):
+        validators["If-None-Match"] = etag
+    if last_modified := response.headers.get("Last-Modified"):
+        validators["If-Modified-Since"] = last_modified
+    return validators
+
+
+async def _conditional_fetch(url: str, source: str, stop_at: Optional[str] = None) -> Optional[str]:
+    """Fetch a page through the page cache.
+
+    Expired pages are revalidated with a conditional GET; on 304 Not Modified
+    the cached HTML is reused and its TTL renewed without downloading the body.
+    If revalidation fails transiently (a transport error, 429 or 5xx), the
+    stale HTML is served and kept for MISSING_PAGE_TTL before the next attempt.
+    A page that is gone upstream drops its stale copy.
+    """
+    cached = _page_cache.get(url)
+    if cached is not None:
+        return cached[0]
+
+    stale = _page_cache.get_stale(url)
+    try:
+        client = await get_client()
+        headers = stale[1] if stale is not None else None
+        async with _host_limit(url), client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and stale is not None:
+                _page_cache.set(url, stale, PAGE_CACHE_TTL)
+                return stale[0]
+            if response.status_code == 200:
+                html = await _read_text(response, stop_at)
+                _page_cache.set(url, (html, _validators(response)), PAGE_CACHE_TTL)
+                return html
+    except Exception as e:
+        logger.error("Error fetching %s page: %s", source, e)
+        if stale is not None and stale[0] is not None:
+            _page_cache.set(url, stale, MISSING_PAGE_TTL)
+            return stale[0]
+        return None
+
+    logger.warning("Failed to fetch %s: %s", url, response.status_code)
+    transient = response.status_code == 429 or response.status_code >= 500
+    if transient and stale is not None and stale[0] is not None:
+        _page_cache.set(url, stale, MISSING_PAGE_TTL)
+        return stale[0]
+    _page_cache.set(url, (None, {}), MISSING_PAGE_TTL)
+    return None
+
+
+def _wiki_url(page_name: str) -> str:
+    """Return the wiki URL for a page name."""
+    return f"{WIKI_BASE_URL}/{normalize_title(page_name)}"
+
 
 async def fetch_wiki_page(page_name: str) -> Optional[str]:
     """Fetch a wiki page by name."""
-    url = f"{WIKI_BASE_URL}/{page_name.replace(' ', '_')}"
-    
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(
-                url,
-                headers={"User-Agent": USER_AGENT},
-                follow_redirects=True
-            )
-            
-            if response.status_code == 200:
-                return response.text
-            else:
-                logger.warning(f"Failed to fetch {url}: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error fetching wiki page: {e}")
-            return None
+    return await _conditional_fetch(_wiki_url(page_name), "wiki", stop_at=WIKI_CONTENT_END)
+
+
+async def fetch_first_successful(names: list[str]) -> Optional[str]:
+    """Fetch several spellings of a wiki page at once and return the first that exists.
+
+    Names are tried in order of preference: a later spelling only wins once
+    every earlier one has failed, so the name the caller gave beats its
+    variants. Names that normalize to the same title are only fetched once,
+    and the remaining fetches are cancelled as soon as a winner is known. A
+    live cache hit for any spelling is returned without touching the network.
+    """
+    titles = list(dict.fromkeys(normalize_title(name) for name in names))
+    uncached = []
+    for title in titles:
+        cached = _page_cache.get(_wiki_url(title))
+        if cached is None:
+            uncached.append(title)
+        elif cached[0] is not None:
+            return cached[0]
+
+    tasks = [asyncio.create_task(fetch_wiki_page(title)) for title in uncached]
+    pending = set(tasks)
+    try:
+        while pending:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                if not task.done():
+                    break
+                if task.result() is not None:
+                    return task.result()
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 async def fetch_gwpvx_page(path: str) -> Optional[str]:
     """Fetch a GWPvX page by path."""
-    url = f"{GWPVX_BASE_URL}/{path}"
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(
-                url,
-                headers={"User-Agent": USER_AGENT},
-                follow_redirects=True
-            )
-            if response.status_code == 200:
-                return response.text
-            logger.warning(f"Failed to fetch {url}: {response.status_code}")
-            return None
-        except Exception as e:
-            logger.error(f"Error fetching GWPvX page: {e}")
-            return None
+    return await _conditional_fetch(f"{GWPVX_BASE_URL}/{path}", "GWPvX")
+
+
+# Quest section header ids mapped to their result keys. All headers are
+# located in a single pass over the tree.
+QUEST_SECTIONS = {
+    "Objectives": "objectives",
+    "Reward": "rewards",
+    "Walkthrough": "walkthrough",
+    "Notes": "notes",
+}
+
+
+def _has_class(tag: str, class_name: str) -> str:
+    """Build an XPath step matching tag elements that carry class_name."""
+    return f'{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]'
+
+
+# XPath expressions are compiled once at import time and reused by every parse.
+_QUEST_SECTION_HEADERS = etree.XPath(
+    "//span[%s]" % " or ".join(f'@id="{section_id}"' for section_id in QUEST_SECTIONS)
+)
+_SKILL_BOX = etree.XPath("//" + _has_class("table", "skill-box"))
+_SKILL_BOX_ROWS = etree.XPath(".//tr")
+_ROW_CELLS = etree.XPath("./th|./td")
+_SKILL_DESCRIPTION = etree.XPath("//" + _has_class("div", "skill-description"))
+_BUILD_LINKS = etree.XPath("//" + _has_class("a", "category-page__member-link"))
+_LEGACY_BUILD_LINKS = etree.XPath('//div[@id="mw-pages"]//li//a')
+
+# Tags that hold a list section, end a walkthrough, or make up its text.
+_LIST_TAGS = ('ul', 'ol')
+_STOP_TAGS = frozenset(('h2', 'h3'))
+_CONTENT_TAGS = frozenset(('p', 'ul', 'ol'))
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _text(element) -> str:
+    """Return an element's text with runs of whitespace collapsed."""
+    return _WHITESPACE.sub(' ', ''.join(element.itertext())).strip()
+
+
+def _item_text(item) -> str:
+    """Return a list item's text, with nested sub-list items appended after "; "."""
+    own = [item.text or '']
+    nested = []
+    for child in item:
+        if child.tag in _LIST_TAGS:
+            nested.extend(_item_text(li) for li in child.iterchildren('li'))
+            own.append(' ')
+        elif isinstance(child.tag, str):
+            own.extend(child.itertext())
+        own.append(child.tail or '')
+    text = _WHITESPACE.sub(' ', ''.join(own)).strip()
+    return "; ".join(part for part in (text, *nested) if part)
+
+
+def _parse_html(html: str):
+    """Parse HTML into an lxml tree, or return None if the document is empty."""
+    try:
+        return lxml.html.fromstring(html)
+    except etree.ParserError:
+        return None
 
 
 def parse_quest_page(html: str, quest_name: str) -> Dict[str, Any]:
     """Parse a quest page and extract structured information."""
-    soup = BeautifulSoup(html, 'lxml')
+    tree = _parse_html(html)
     
     result = {
         "name": quest_name,
@@ -78,43 +294,31 @@ def parse_quest_page(html: str, quest_name: str) -> Dict[str, Any]:
         "walkthrough": None,
         "notes": None,
     }
+    if tree is None:
+        result["found"] = False
+        return result
     
-    # Extract objectives
-    objectives_header = soup.find('span', id='Objectives')
-    if objectives_header:
-        objectives_section = objectives_header.find_parent()
-        objectives_list = objectives_section.find_next_sibling(['ul', 'ol'])
-        if objectives_list:
-            result["objectives"] = [li.get_text(strip=True) for li in objectives_list.find_all('li')]
-    
-    # Extract rewards
-    reward_header = soup.find('span', id='Reward')
-    if reward_header:
-        reward_section = reward_header.find_parent()
-        reward_list = reward_section.find_next_sibling(['ul', 'ol'])
-        if reward_list:
-            result["rewards"] = [li.get_text(strip=True) for li in reward_list.find_all('li')]
-    
-    # Extract walkthrough/guide
-    walkthrough_header = soup.find('span', id='Walkthrough')
-    if walkthrough_header:
-        walkthrough_section = walkthrough_header.find_parent()
-        # Get the next few paragraphs/lists
-        walkthrough_content = []
-        for sibling in walkthrough_section.find_next_siblings():
-            if sibling.name in ['h2', 'h3']:  # Stop at next header
-                break
-            if sibling.name in ['p', 'ul', 'ol']:
-                walkthrough_content.append(sibling.get_text(strip=True))
-        result["walkthrough"] = "\n".join(walkthrough_content) if walkthrough_content else None
-    
-    # Extract notes
-    notes_header = soup.find('span', id='Notes')
-    if notes_header:
-        notes_section = notes_header.find_parent()
-        notes_list = notes_section.find_next_sibling(['ul', 'ol'])
-        if notes_list:
-            result["notes"] = [li.get_text(strip=True) for li in notes_list.find_all('li')]
+    seen = set()
+    for span in _QUEST_SECTION_HEADERS(tree):
+        key = QUEST_SECTIONS[span.get('id')]
+        section = span.getparent()
+        if key in seen or section is None:
+            continue
+        seen.add(key)
+        
+        if key == "walkthrough":
+            # Get the next few paragraphs/lists
+            walkthrough_content = []
+            for sibling in section.itersiblings():
+                if sibling.tag in _STOP_TAGS:  # Stop at next header
+                    break
+                if sibling.tag in _CONTENT_TAGS:
+                    walkthrough_content.append(_text(sibling))
+            result[key] = "\n".join(walkthrough_content) if walkthrough_content else None
+        else:
+            section_list = next(section.itersiblings(*_LIST_TAGS), None)
+            if section_list is not None:
+                result[key] = [_item_text(li) for li in section_list.iterchildren('li')]
     
     return result
 
@@ -124,36 +328,33 @@ def format_quest_response(quest_data: Dict[str, Any]) -> str:
     if not quest_data["found"]:
         return f"Quest '{quest_data['name']}' not found in the Guild Wars Wiki."
     
-    response = f"# {quest_data['name']}\n\n"
+    parts = [f"# {quest_data['name']}\n\n"]
     
     if quest_data["objectives"]:
-        response += "## Objectives\n"
-        for obj in quest_data["objectives"]:
-            response += f"- {obj}\n"
-        response += "\n"
+        parts.append("## Objectives\n")
+        parts.append("".join(f"- {obj}\n" for obj in quest_data["objectives"]))
+        parts.append("\n")
     
     if quest_data["rewards"]:
-        response += "## Rewards\n"
-        for reward in quest_data["rewards"]:
-            response += f"- {reward}\n"
-        response += "\n"
+        parts.append("## Rewards\n")
+        parts.append("".join(f"- {reward}\n" for reward in quest_data["rewards"]))
+        parts.append("\n")
     
     if quest_data["walkthrough"]:
-        response += "## Walkthrough\n"
-        response += quest_data["walkthrough"]
-        response += "\n\n"
+        parts.append("## Walkthrough\n")
+        parts.append(quest_data["walkthrough"])
+        parts.append("\n\n")
     
     if quest_data["notes"]:
-        response += "## Notes\n"
-        for note in quest_data["notes"]:
-            response += f"- {note}\n"
+        parts.append("## Notes\n")
+        parts.append("".join(f"- {note}\n" for note in quest_data["notes"]))
     
-    return response
+    return "".join(parts)
 
 
 def parse_skill_page(html: str, skill_name: str) -> Dict[str, Any]:
     """Parse a skill page and extract information."""
-    soup = BeautifulSoup(html, 'lxml')
+    tree = _parse_html(html)
     
     result = {
         "name": skill_name,
@@ -169,19 +370,18 @@ def parse_skill_page(html: str, skill_name: str) -> Dict[str, Any]:
     }
     
     # Look for the skill infobox
-    infobox = soup.find('table', class_='skill-box')
-    if not infobox:
+    infoboxes = _SKILL_BOX(tree) if tree is not None else []
+    if not infoboxes:
         result["found"] = False
         return result
     
     # Extract basic info from infobox
     # Note: The actual structure varies, you'll need to inspect the wiki
-    rows = infobox.find_all('tr')
-    for row in rows:
-        cells = row.find_all(['th', 'td'])
+    for row in _SKILL_BOX_ROWS(infoboxes[0]):
+        cells = _ROW_CELLS(row)
         if len(cells) >= 2:
-            header = cells[0].get_text(strip=True).lower()
-            value = cells[1].get_text(strip=True)
+            header = _text(cells[0]).lower()
+            value = _text(cells[1])
             
             if 'profession' in header:
                 result["profession"] = value
@@ -195,9 +395,9 @@ def parse_skill_page(html: str, skill_name: str) -> Dict[str, Any]:
                 result["recharge"] = value
     
     # Get skill description
-    description_div = soup.find('div', class_='skill-description')
-    if description_div:
-        result["description"] = description_div.get_text(strip=True)
+    descriptions = _SKILL_DESCRIPTION(tree)
+    if descriptions:
+        result["description"] = _text(descriptions[0])
     
     return result
 
@@ -207,37 +407,39 @@ def format_skill_response(skill_data: Dict[str, Any]) -> str:
     if not skill_data["found"]:
         return f"Skill '{skill_data['name']}' not found in the Guild Wars Wiki."
     
-    response = f"# {skill_data['name']}\n\n"
+    parts = [f"# {skill_data['name']}\n\n"]
     
     if skill_data["profession"]:
-        response += f"**Profession:** {skill_data['profession']}\n"
+        parts.append(f"**Profession:** {skill_data['profession']}\n")
     if skill_data["attribute"]:
-        response += f"**Attribute:** {skill_data['attribute']}\n"
+        parts.append(f"**Attribute:** {skill_data['attribute']}\n")
     if skill_data["campaign"]:
-        response += f"**Campaign:** {skill_data['campaign']}\n"
+        parts.append(f"**Campaign:** {skill_data['campaign']}\n")
     
-    response += "\n**Stats:**\n"
+    parts.append("\n**Stats:**\n")
     if skill_data["energy"]:
-        response += f"- Energy: {skill_data['energy']}\n"
+        parts.append(f"- Energy: {skill_data['energy']}\n")
     if skill_data["activation"]:
-        response += f"- Activation: {skill_data['activation']}\n"
+        parts.append(f"- Activation: {skill_data['activation']}\n")
     if skill_data["recharge"]:
-        response += f"- Recharge: {skill_data['recharge']}\n"
+        parts.append(f"- Recharge: {skill_data['recharge']}\n")
     
     if skill_data["description"]:
-        response += f"\n**Description:**\n{skill_data['description']}\n"
+        parts.append(f"\n**Description:**\n{skill_data['description']}\n")
     
-    return response
+    return "".join(parts)
 
 
 def parse_pve_builds(html: str) -> list[Dict[str, str]]:
     """Parse a GWPvX category page for PvE builds."""
-    soup = BeautifulSoup(html, "lxml")
+    tree = _parse_html(html)
     builds: list[Dict[str, str]] = []
+    if tree is None:
+        return builds
 
     # Newer Fandom layout
-    for link in soup.select("a.category-page__member-link"):
-        name = link.get_text(strip=True)
+    for link in _BUILD_LINKS(tree):
+        name = _text(link)
         href = link.get("href", "")
         if href and href.startswith("/"):
             href = f"{GWPVX_BASE_URL}{href}"
@@ -245,8 +447,8 @@ def parse_pve_builds(html: str) -> list[Dict[str, str]]:
 
     # Fallback to legacy category lists
     if not builds:
-        for link in soup.select("div#mw-pages li a"):
-            name = link.get_text(strip=True)
+        for link in _LEGACY_BUILD_LINKS(tree):
+            name = _text(link)
             href = link.get("href", "")
             if href and href.startswith("/"):
                 href = f"{GWPVX_BASE_URL}{href}"
@@ -261,14 +463,11 @@ def format_pve_builds_response(category: str, builds: list[Dict[str, str]], limi
         return f"No builds found for category '{category}'."
 
     sliced = builds[:limit] if limit else builds
-    response = f"# PvE builds - {category.title()}\n\n"
+    parts = [f"# PvE builds - {category.title()}\n\n"]
     for build in sliced:
         name = build.get("name", "Unknown build")
         url = build.get("url", "")
-        response += f"- {name}"
-        if url:
-            response += f" — {url}"
-        response += "\n"
+        parts.append(f"- {name} — {url}\n" if url else f"- {name}\n")
     if limit and len(builds) > limit:
-        response += f"\nShowing first {limit} builds of {len(builds)} total."
-    return response
+        parts.append(f"\nShowing first {limit} builds of {len(builds)} total.")
+    return "".join(parts)
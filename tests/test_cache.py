@@ -0,0 +1,246 @@
+"""Tests for page fetching and caching."""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from guildwars_mcp import wiki_parser
+from guildwars_mcp.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    """Entries disappear once their TTL has elapsed."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=4, timer=clock)
+    cache.set("a", 1, ttl=10)
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.get_stale("a") == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted when the cache is full."""
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+@pytest_asyncio.fixture
+async def fake_wiki(monkeypatch):
+    """Route fetches to a fake transport.
+
+    Yields an installer taking a MockTransport handler and an optional clock
+    for the page cache; it returns the fresh cache. Clients are closed on
+    teardown.
+    """
+    clients = []
+
+    def install(handler, clock=None):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        cache = TTLCache(maxsize=64, timer=clock) if clock else TTLCache(maxsize=64)
+        monkeypatch.setattr(wiki_parser, "_client", client)
+        monkeypatch.setattr(wiki_parser, "_page_cache", cache)
+        monkeypatch.setattr(wiki_parser, "_host_limits", {})
+        return cache
+
+    yield install
+    for client in clients:
+        await client.aclose()
+
+
+@pytest.fixture
+def wiki(fake_wiki):
+    """Serve every page except Missing_Page and record requested paths."""
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path.endswith("Missing_Page"):
+            return httpx.Response(404)
+        return httpx.Response(200, text=f"<html>{request.url.path}</html>")
+
+    fake_wiki(handler)
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_fetch_wiki_page_is_cached(wiki):
+    """Spelling variants of the same title share one fetch."""
+    first = await wiki_parser.fetch_wiki_page("Meteor Shower")
+    second = await wiki_parser.fetch_wiki_page("meteor_Shower")
+    assert first == second
+    assert wiki == ["/wiki/Meteor_Shower"]
+
+
+@pytest.mark.asyncio
+async def test_missing_page_is_negatively_cached(wiki):
+    """A missing page is only requested once while its negative entry is live."""
+    assert await wiki_parser.fetch_wiki_page("Missing Page") is None
+    assert await wiki_parser.fetch_wiki_page("Missing Page") is None
+    assert wiki == ["/wiki/Missing_Page"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_first_successful_falls_back_to_variant(wiki):
+    """The first spelling that exists wins, and duplicate titles are fetched once."""
+    html = await wiki_parser.fetch_first_successful(["Missing Page", "missing_Page", "Other Page"])
+    assert html == "<html>/wiki/Other_Page</html>"
+    assert sorted(wiki) == ["/wiki/Missing_Page", "/wiki/Other_Page"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_first_successful_cache_hit_makes_no_requests(fake_wiki):
+    """Once one spelling is cached, repeat lookups never reach the network."""
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+        if request.url.path == "/wiki/Against_The_Charr":
+            await asyncio.sleep(0.01)
+            return httpx.Response(404)
+        return httpx.Response(200, text="<p>quest</p>")
+
+    fake_wiki(handler)
+
+    names = ["Against the Charr", "Against The Charr"]
+    assert await wiki_parser.fetch_first_successful(names) == "<p>quest</p>"
+    requests.clear()
+    assert await wiki_parser.fetch_first_successful(names) == "<p>quest</p>"
+    assert requests == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_first_successful_prefers_given_spelling(fake_wiki):
+    """The caller's spelling wins over a faster variant, and losers are reaped."""
+    async def handler(request):
+        if request.url.path == "/wiki/Meteor_shower":
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, text="<p>given</p>")
+        if request.url.path == "/wiki/Slow_Variant":
+            await asyncio.sleep(10)
+        return httpx.Response(200, text="<p>variant</p>")
+
+    fake_wiki(handler)
+
+    assert await wiki_parser.fetch_first_successful(["Meteor shower", "Meteor Shower"]) == "<p>given</p>"
+    assert await wiki_parser.fetch_first_successful(["Fast", "Slow Variant"]) == "<p>variant</p>"
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+
+
+@pytest.mark.asyncio
+async def test_read_text_stops_at_marker_split_across_chunks():
+    """The body is cut just before the marker, even when a chunk boundary splits it."""
+    async def body():
+        yield b"<p>content</p><div cla"
+        yield b'ss="printfooter">footer'
+        yield b"<script>junk</script>"
+
+    response = httpx.Response(200, content=body())
+    text = await wiki_parser._read_text(response, wiki_parser.WIKI_CONTENT_END)
+    assert text == "<p>content</p>"
+
+
+@pytest.mark.asyncio
+async def test_expired_page_is_revalidated_with_etag(fake_wiki):
+    """An expired page is refreshed with If-None-Match and reused on 304."""
+    seen_etags = []
+
+    def handler(request):
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<p>page</p>", headers={"ETag": '"v1"'})
+
+    clock = FakeClock()
+    fake_wiki(handler, clock)
+
+    assert await wiki_parser.fetch_gwpvx_page("Build:Test") == "<p>page</p>"
+    clock.now = wiki_parser.PAGE_CACHE_TTL
+    assert await wiki_parser.fetch_gwpvx_page("Build:Test") == "<p>page</p>"
+    assert await wiki_parser.fetch_gwpvx_page("Build:Test") == "<p>page</p>"
+    assert seen_etags == [None, '"v1"']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failure", [httpx.Response(503), httpx.ConnectError("down")])
+async def test_failed_revalidation_serves_stale_page(fake_wiki, failure):
+    """A transient refresh failure serves the stale copy and backs off before retrying."""
+    responses = [httpx.Response(200, text="<p>page</p>", headers={"ETag": '"v1"'}), failure, httpx.Response(304)]
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("If-None-Match"))
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    clock = FakeClock()
+    fake_wiki(handler, clock)
+
+    assert await wiki_parser.fetch_gwpvx_page("Build:Test") == "<p>page</p>"
+    clock.now = wiki_parser.PAGE_CACHE_TTL
+    for _ in range(5):
+        assert await wiki_parser.fetch_gwpvx_page("Build:Test") == "<p>page</p>"
+    assert len(requests) == 2
+
+    clock.now += wiki_parser.MISSING_PAGE_TTL
+    assert await wiki_parser.fetch_gwpvx_page("Build:Test") == "<p>page</p>"
+    assert requests == [None, '"v1"', '"v1"']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [404, 410])
+async def test_revalidation_of_removed_page_drops_stale_copy(fake_wiki, status):
+    """A page that is gone upstream is no longer served from its stale copy."""
+    responses = [httpx.Response(200, text="<p>page</p>"), httpx.Response(status)]
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        return responses[len(requests) - 1]
+
+    clock = FakeClock()
+    fake_wiki(handler, clock)
+
+    assert await wiki_parser.fetch_gwpvx_page("Build:Test") == "<p>page</p>"
+    clock.now = wiki_parser.PAGE_CACHE_TTL
+    assert await wiki_parser.fetch_gwpvx_page("Build:Test") is None
+    assert await wiki_parser.fetch_gwpvx_page("Build:Test") is None
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_requests_per_host_are_capped(fake_wiki):
+    """No more than MAX_REQUESTS_PER_HOST requests run against one host at once."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, text="<p>page</p>")
+
+    fake_wiki(handler)
+
+    await asyncio.gather(*(wiki_parser.fetch_gwpvx_page(f"Build:{n}") for n in range(20)))
+    assert peak == wiki_parser.MAX_REQUESTS_PER_HOST
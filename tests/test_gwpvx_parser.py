@@ -17,6 +17,17 @@ def test_parse_pve_builds_primary_selector():
     assert builds[0]["url"].endswith("Build:Mo/W_General_Survivor")
 
 
+def test_parse_pve_builds_legacy_fallback():
+    """Ensure the legacy category list is used when no Fandom links exist."""
+    html = """
+    <div id="mw-pages">
+        <ul><li><a href="/wiki/Build:R/A_Dash_Runner">R/A Dash Runner</a></li></ul>
+    </div>
+    """
+    builds = parse_pve_builds(html)
+    assert [build["name"] for build in builds] == ["R/A Dash Runner"]
+
+
 def test_format_pve_builds_response_limit():
     """Ensure formatting respects limits and reports totals."""
     builds = [
@@ -1,7 +1,7 @@
 """Tests for the Guild Wars Wiki MCP server."""
 
 import pytest
-from guildwars_mcp.wiki_parser import fetch_wiki_page, parse_quest_page
+from guildwars_mcp.wiki_parser import WIKI_BASE_URL, fetch_wiki_page, get_client, parse_quest_page
 
 
 @pytest.mark.asyncio
@@ -20,3 +20,44 @@ async def test_parse_quest():
         quest_data = parse_quest_page(html, "Against the Charr")
         assert quest_data["found"] is True
         # Add more specific assertions based on the quest
+
+
+@pytest.mark.asyncio
+async def test_client_negotiates_http2():
+    """Test that the shared client talks HTTP/2 to the wiki."""
+    client = await get_client()
+    response = await client.get(f"{WIKI_BASE_URL}/The_Path_to_Glory")
+    assert response.http_version == "HTTP/2"
+
+
+@pytest.mark.asyncio
+async def test_client_accepts_brotli():
+    """Test that the shared client advertises Brotli alongside gzip."""
+    client = await get_client()
+    encodings = [value.strip() for value in client.headers["Accept-Encoding"].split(",")]
+    assert "br" in encodings and "gzip" in encodings
+
+
+@pytest.mark.asyncio
+async def test_call_tool_reuses_rendered_response(monkeypatch):
+    """Test that repeat lookups of an unchanged page skip parsing."""
+    from guildwars_mcp import server
+
+    parsed = []
+
+    async def fake_fetch(names):
+        return "<html><h2><span id='Objectives'>Objectives</span></h2><ul><li>Win</li></ul></html>"
+
+    def counting_parse(html, quest_name):
+        parsed.append(quest_name)
+        return parse_quest_page(html, quest_name)
+
+    monkeypatch.setattr(server, "fetch_first_successful", fake_fetch)
+    monkeypatch.setattr(server, "parse_quest_page", counting_parse)
+    monkeypatch.setattr(server, "_response_cache", server.TTLCache(maxsize=8))
+
+    first = await server.call_tool("get_quest_info", {"quest_name": "Test Quest"})
+    second = await server.call_tool("get_quest_info", {"quest_name": "Test Quest"})
+    assert first[0].text == second[0].text
+    assert "- Win" in first[0].text
+    assert parsed == ["Test Quest"]
@@ -0,0 +1,86 @@
+"""Tests for parsing Guild Wars Wiki quest and skill pages."""
+
+import pytest
+
+from guildwars_mcp.wiki_parser import parse_pve_builds, parse_quest_page, parse_skill_page
+
+
+QUEST_HTML = """
+<div id="mw-content-text">
+    <h2><span class="mw-headline" id="Objectives">Objectives</span></h2>
+    <ul><li>Talk to <a href="/wiki/Foo">Foo</a> in Ascalon.</li><li>Kill the Charr.</li></ul>
+    <h2><span class="mw-headline" id="Reward">Reward</span></h2>
+    <p>You receive:</p>
+    <ol><li>500 XP</li></ol>
+    <h2><span class="mw-headline" id="Walkthrough">Walkthrough</span></h2>
+    <p>Go north.</p>
+    <div>Not part of the walkthrough text.</div>
+    <ul><li>Follow the road.</li></ul>
+    <h3><span id="Tips">Tips</span></h3>
+    <p>Stop here.</p>
+    <h2><span class="mw-headline" id="Notes">Notes</span></h2>
+    <ul><li>Repeatable.</li></ul>
+</div>
+"""
+
+SKILL_HTML = """
+<table class="noprint skill-box">
+    <tr><th>Profession</th><td>Elementalist</td></tr>
+    <tr><th>Attribute</th><td><a href="/wiki/Fire_Magic">Fire Magic</a></td></tr>
+    <tr><th>Energy</th><td>25</td></tr>
+    <tr><th>Activation</th><td>5</td></tr>
+    <tr><th>Recharge</th><td>60</td></tr>
+</table>
+<div class="skill-description">Spell. Calls down <b>meteors</b>.</div>
+"""
+
+
+def test_parse_quest_page_sections():
+    """Ensure each quest section is extracted from its header."""
+    quest = parse_quest_page(QUEST_HTML, "Test Quest")
+    assert quest["objectives"] == ["Talk to Foo in Ascalon.", "Kill the Charr."]
+    assert quest["rewards"] == ["500 XP"]
+    assert quest["walkthrough"] == "Go north.\nFollow the road."
+    assert quest["notes"] == ["Repeatable."]
+
+
+def test_parse_quest_page_missing_sections():
+    """Sections without a header stay None."""
+    quest = parse_quest_page("<div><p>Stub page.</p></div>", "Stub")
+    assert quest["found"] is True
+    assert quest["objectives"] is None and quest["walkthrough"] is None
+
+
+def test_parse_skill_page_infobox():
+    """Ensure infobox rows and the description are extracted."""
+    skill = parse_skill_page(SKILL_HTML, "Meteor Shower")
+    assert skill["found"] is True
+    assert skill["profession"] == "Elementalist"
+    assert skill["attribute"] == "Fire Magic"
+    assert (skill["energy"], skill["activation"], skill["recharge"]) == ("25", "5", "60")
+    assert skill["description"] == "Spell. Calls down meteors."
+
+
+def test_parse_skill_page_without_infobox():
+    """Pages without a skill infobox are reported as not found."""
+    assert parse_skill_page("<div><p>Not a skill.</p></div>", "Nope")["found"] is False
+
+
+def test_parse_quest_page_collapses_whitespace_and_nested_items():
+    """Nested sub-list items are kept apart from their parent's text."""
+    html = """
+    <div>
+        <h2><span id="Notes">Notes</span></h2>
+        <ul><li>First
+            line<ul><li>nested</li></ul></li><li>Second</li></ul>
+    </div>
+    """
+    assert parse_quest_page(html, "Q")["notes"] == ["First line; nested", "Second"]
+
+
+@pytest.mark.parametrize("html", ["", "   \n", "<!-- nothing here -->"])
+def test_parsers_handle_empty_documents(html):
+    """Empty bodies are reported as not found instead of raising."""
+    assert parse_quest_page(html, "Q")["found"] is False
+    assert parse_skill_page(html, "S")["found"] is False
+    assert parse_pve_builds(html) == []